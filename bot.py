@@ -1,7 +1,10 @@
 """Telegram bot for tracking egg production."""
 
+import asyncio
 import logging
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 
 from dotenv import load_dotenv
 from telegram import Update
@@ -24,6 +27,29 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# How often (in seconds) queued egg counts are written to the sheet
+DEFAULT_FLUSH_INTERVAL = 5
+
+# Threads available for blocking Sheets calls
+SHEETS_MAX_WORKERS = 16
+
+# Messages that look like an egg count; anything else gets the help text
+NUMBER_PATTERN = re.compile(r"^\s*-?\d+\s*$")
+
+
+async def refresh_records() -> None:
+    """Re-read the sheet into the records cache off the request path."""
+    try:
+        await asyncio.to_thread(sheets.refresh_records)
+    except Exception as e:
+        logger.error(f"Error refreshing records: {e}")
+
+
+def refresh_if_stale(application: Application) -> None:
+    """Schedule a background cache refresh if the cached records have expired."""
+    if sheets.cache_is_stale():
+        application.create_task(refresh_records())
+
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle the /start command."""
@@ -40,13 +66,13 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 async def stats(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle the /stats command - show weekly statistics."""
     try:
-        today_total = sheets.get_today_total()
-        week_total = sheets.get_week_total()
-        breakdown = sheets.get_week_breakdown()
+        # Answer from the cache right away and refresh it afterwards
+        today_total, week_total, breakdown = await asyncio.to_thread(
+            sheets.get_stats_bundle, allow_stale=True
+        )
 
         # Build the breakdown string
-        breakdown_lines = [f"  {date}: {count}" for date, count in breakdown]
-        breakdown_str = "\n".join(breakdown_lines)
+        breakdown_str = "\n".join(f"  {date}: {count}" for date, count in breakdown)
 
         message = (
             f"Weekly Stats\n"
@@ -56,6 +82,7 @@ async def stats(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
             f"Daily Breakdown:\n{breakdown_str}"
         )
         await update.message.reply_text(message)
+        refresh_if_stale(context.application)
 
     except Exception as e:
         logger.error(f"Error getting stats: {e}")
@@ -66,15 +93,15 @@ async def stats(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 
 async def handle_number(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle numeric messages - add eggs to today's count."""
+    # Only messages matching NUMBER_PATTERN are routed here, so anything
+    # that isn't all digits is a negative number
     text = update.message.text.strip()
+    if not text.isdigit():
+        await update.message.reply_text("Please send a positive number.")
+        return
+    count = int(text)
 
     try:
-        count = int(text)
-
-        if count < 0:
-            await update.message.reply_text("Please send a positive number.")
-            return
-
         if count > 100:
             await update.message.reply_text(
                 "That seems like a lot of eggs! Are you sure? "
@@ -82,17 +109,20 @@ async def handle_number(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
             )
             return
 
-        today_total, week_total = sheets.add_eggs(count)
+        # The count is queued and written to the sheet by flush_periodically,
+        # so the reply only waits on the sheet if nothing has been cached yet
+        today_total, week_total = await asyncio.to_thread(
+            sheets.add_eggs, count, allow_stale=True
+        )
+        context.bot_data.setdefault("unsaved_chats", set()).add(
+            update.effective_chat.id
+        )
 
         await update.message.reply_text(
             f"Added {count} eggs! Today: {today_total} | Week: {week_total}"
         )
+        refresh_if_stale(context.application)
 
-    except ValueError:
-        # Not a number, ignore or provide help
-        await update.message.reply_text(
-            "Send a number to log eggs, or /stats for weekly stats."
-        )
     except Exception as e:
         logger.error(f"Error adding eggs: {e}")
         await update.message.reply_text(
@@ -100,21 +130,112 @@ async def handle_number(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
         )
 
 
+async def handle_other_text(
+    update: Update, context: ContextTypes.DEFAULT_TYPE
+) -> None:
+    """Handle non-numeric messages - point the user at the commands."""
+    await update.message.reply_text(
+        "Send a number to log eggs, or /stats for weekly stats."
+    )
+
+
+async def flush_periodically(application: Application, interval: float) -> None:
+    """
+    Write queued egg counts to the sheet every `interval` seconds.
+
+    If a flush fails, the chats that logged eggs since the last successful
+    flush are told once; the counts stay queued and are retried next time.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        chat_ids = application.bot_data.pop("unsaved_chats", set())
+        try:
+            await asyncio.to_thread(sheets.flush_pending)
+        except Exception as e:
+            logger.error(f"Error flushing egg counts: {e}")
+            for chat_id in chat_ids:
+                try:
+                    await application.bot.send_message(
+                        chat_id,
+                        "Heads up: I couldn't save your eggs to the sheet yet. "
+                        "I'll keep retrying.",
+                    )
+                except Exception as notify_error:
+                    logger.error(f"Error notifying chat {chat_id}: {notify_error}")
+
+
+async def start_background_tasks(application: Application) -> None:
+    """Set up the Sheets thread pool and start the background flush task."""
+    # Sheets calls block, so they run in threads to keep the event loop free
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=SHEETS_MAX_WORKERS)
+    )
+
+    interval = float(os.environ.get("SHEETS_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL))
+    application.bot_data["flush_task"] = asyncio.create_task(
+        flush_periodically(application, interval)
+    )
+
+
+async def stop_background_tasks(application: Application) -> None:
+    """Stop the background flush task and write any remaining counts."""
+    application.bot_data["flush_task"].cancel()
+    try:
+        await asyncio.to_thread(sheets.flush_pending)
+    except Exception as e:
+        logger.error(f"Error flushing egg counts on shutdown: {e}")
+
+
+def build_application(token: str) -> Application:
+    """
+    Build the bot application with all handlers registered.
+
+    run_polling() and run_webhook() call start_background_tasks() and
+    stop_background_tasks() themselves. Other entry points (e.g. driving the
+    application from an existing web server) must await them after
+    application.start() and after application.stop().
+
+    Only run one instance per sheet: each one queues and flushes its own
+    writes, and two flushes at once can lose an update.
+    """
+    # Updates are handled one at a time unless concurrent_updates is set;
+    # allow as many in flight as there are threads for their Sheets calls
+    application = (
+        Application.builder()
+        .token(token)
+        .concurrent_updates(SHEETS_MAX_WORKERS)
+        .post_init(start_background_tasks)
+        .post_stop(stop_background_tasks)
+        .build()
+    )
+
+    application.add_handler(CommandHandler("start", start))
+    application.add_handler(CommandHandler("stats", stats))
+    number_filter = filters.Regex(NUMBER_PATTERN)
+    application.add_handler(
+        MessageHandler(filters.TEXT & ~filters.COMMAND & number_filter, handle_number)
+    )
+    application.add_handler(
+        MessageHandler(
+            filters.TEXT & ~filters.COMMAND & ~number_filter, handle_other_text
+        )
+    )
+
+    return application
+
+
 def main() -> None:
     """Start the bot."""
     token = os.environ.get("TELEGRAM_BOT_TOKEN")
     if not token:
         raise ValueError("TELEGRAM_BOT_TOKEN environment variable not set")
 
-    # Create application
-    application = Application.builder().token(token).build()
+    # Fail fast on bad Google credentials or cache settings rather than on
+    # the first message
+    sheets.load_credentials()
+    sheets.load_cache_ttl()
 
-    # Add handlers
-    application.add_handler(CommandHandler("start", start))
-    application.add_handler(CommandHandler("stats", stats))
-    application.add_handler(
-        MessageHandler(filters.TEXT & ~filters.COMMAND, handle_number)
-    )
+    application = build_application(token)
 
     # Run the bot
     # Check if we're in webhook mode (for production) or polling (for dev)
@@ -129,9 +250,11 @@ def main() -> None:
             port=port,
             url_path=token,
             webhook_url=f"{webhook_url}/{token}",
+            max_connections=int(os.environ.get("TELEGRAM_MAX_CONNECTIONS", 40)),
+            drop_pending_updates=False,
         )
     else:
-        # Development: use polling
+        # Development: use polling. Only one process may poll at a time.
         logger.info("Starting polling mode")
         application.run_polling(allowed_updates=Update.ALL_TYPES)
 
@@ -1,152 +1,741 @@
 """Google Sheets integration for egg tracking."""
 
+import atexit
 import json
+import logging
 import os
-from datetime import datetime, timedelta
+import random
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, TypeVar
 from zoneinfo import ZoneInfo
 
-import gspread
-from google.oauth2.service_account import Credentials
+# gspread, google-auth and redis are imported on first use to keep startup fast
+if TYPE_CHECKING:
+    import gspread
+    import redis
+    from google.oauth2.service_account import Credentials
+
+logger = logging.getLogger(__name__)
 
 SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
 SHEET_NAME = "EggLog"
 EASTERN_TZ = ZoneInfo("America/New_York")
 
+# Keep-alive pool shared by handler threads, with retries for transient errors.
+# 429s are left to _sheets_call, which backs off for longer; retried here they
+# would surface as a RetryError instead of an APIError.
+HTTP_POOL_CONNECTIONS = 8
+HTTP_POOL_MAXSIZE = 32
+HTTP_RETRY_STATUSES = [500, 502, 503, 504]
+
+# Service account credentials, authenticated client and worksheet, built once
+# per process
+_credentials: "Credentials | None" = None
+_client: "gspread.Client | None" = None
+_worksheet: "gspread.Worksheet | None" = None
+_lock = threading.Lock()
+
+# Records read from columns A:B, kept as parallel lists of dates and counts
+Records = tuple[list[str], list[int]]
+
+# Cached worksheet records as (fetch time, records); a fetch time of 0 means
+# stale and records of None means the sheet hasn't been read yet
+DEFAULT_CACHE_TTL = 60
+_cache_ttl: float | None = None  # from SHEETS_CACHE_TTL, read once per process
+_records_cache: tuple[float, Records | None] = (0.0, None)
+_records_lock = threading.Lock()
+# Held for the duration of a sheet read or flush, so concurrent loads share
+# one read and never interleave with a write
+_sheet_lock = threading.Lock()
+
+# Only the bottom of the sheet is read; two weeks of rows covers the 7-day
+# window even with some duplicate dates
+RECORD_WINDOW = 14
+_DAY_OFFSETS = tuple(range(7))  # days ago covered by the weekly stats
+_row_count: int | None = None  # last row with a date, including the header
+_date_index: dict[str, int] = {}  # index of each cached date in the records
+# Sheet row of each date, as read or reported back by an append; dates added
+# locally have no row until they're appended on flush
+_date_to_row: dict[str, int] = {}
+
+# Records are also persisted so a restarted process can skip the first read:
+# to Redis when REDIS_URL is set (needs the redis package), else to a local file
+CACHE_DIR = tempfile.gettempdir()
+_redis: "redis.Redis | None" = None
+
+# Eggs added locally but not yet written to the sheet, as per-date deltas
+_pending_deltas: dict[str, int] = {}
+# Writes whose outcome is unknown (e.g. the connection dropped before the
+# response arrived), as date -> (delta, count written). The next flush checks
+# whether each one landed before sending its delta again.
+_unconfirmed_writes: dict[str, tuple[int, int]] = {}
+
+# Token bucket kept under the Sheets quota of 100 requests per 100 seconds,
+# plus backoff for 429s that still get through (e.g. from other apps sharing
+# the quota)
+RATE_LIMIT_REQUESTS = 90
+RATE_LIMIT_PERIOD = 100
+MAX_RATE_LIMIT_RETRIES = 5
+_rate_tokens = float(RATE_LIMIT_REQUESTS)
+_rate_updated = time.monotonic()
+_rate_lock = threading.Lock()
+
+T = TypeVar("T")
+
 
 def now_eastern() -> datetime:
     """Get current datetime in Eastern Time."""
     return datetime.now(EASTERN_TZ)
 
 
-def get_client() -> gspread.Client:
-    """Create and return an authenticated gspread client."""
-    creds_json = os.environ.get("GOOGLE_SERVICE_ACCOUNT_JSON")
-    if not creds_json:
-        raise ValueError("GOOGLE_SERVICE_ACCOUNT_JSON environment variable not set")
+def load_credentials() -> "Credentials":
+    """
+    Parse GOOGLE_SERVICE_ACCOUNT_JSON into credentials, once per process.
 
-    creds_dict = json.loads(creds_json)
-    credentials = Credentials.from_service_account_info(creds_dict, scopes=SCOPES)
-    return gspread.authorize(credentials)
+    Call at startup to fail fast on missing or malformed credentials.
+    """
+    global _credentials
+    if _credentials is None:
+        from google.oauth2.service_account import Credentials
+
+        creds_json = os.environ.get("GOOGLE_SERVICE_ACCOUNT_JSON")
+        if not creds_json:
+            raise ValueError("GOOGLE_SERVICE_ACCOUNT_JSON environment variable not set")
+
+        try:
+            creds_dict = json.loads(creds_json)
+            _credentials = Credentials.from_service_account_info(
+                creds_dict, scopes=SCOPES
+            )
+        except ValueError as e:
+            raise ValueError(f"Invalid GOOGLE_SERVICE_ACCOUNT_JSON: {e}") from e
+    return _credentials
+
+
+def _acquire_rate_limit() -> None:
+    """Block until the token bucket allows another Sheets request."""
+    global _rate_tokens, _rate_updated
+    while True:
+        with _rate_lock:
+            now = time.monotonic()
+            _rate_tokens = min(
+                RATE_LIMIT_REQUESTS,
+                _rate_tokens
+                + (now - _rate_updated) * RATE_LIMIT_REQUESTS / RATE_LIMIT_PERIOD,
+            )
+            _rate_updated = now
+            if _rate_tokens >= 1:
+                _rate_tokens -= 1
+                return
+            wait = (1 - _rate_tokens) * RATE_LIMIT_PERIOD / RATE_LIMIT_REQUESTS
+
+        logger.warning(f"Sheets request rate limited, waiting {wait:.1f}s")
+        time.sleep(wait)
+
+
+def _sheets_call(func: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Make a Sheets API call within the rate limit.
 
+    Calls rejected with a 429 are retried with exponential backoff and jitter.
+    This can sleep for a long time, so never call it with _records_lock held.
+    """
+    from gspread.exceptions import APIError
+
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        _acquire_rate_limit()
+        try:
+            return func(*args, **kwargs)
+        except APIError as e:
+            if e.response.status_code != 429 or attempt == MAX_RATE_LIMIT_RETRIES:
+                raise
+            delay = min(60, 2**attempt + random.random())
+            logger.warning(f"Sheets quota exceeded, retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def get_client() -> "gspread.Client":
+    """Return the authenticated gspread client, creating it on first use."""
+    global _client
+    with _lock:
+        if _client is None:
+            import gspread
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            _client = gspread.authorize(load_credentials())
+            # Only idempotent methods are retried (urllib3's default), so
+            # appends are never duplicated
+            adapter = HTTPAdapter(
+                pool_connections=HTTP_POOL_CONNECTIONS,
+                pool_maxsize=HTTP_POOL_MAXSIZE,
+                max_retries=Retry(
+                    total=3,
+                    backoff_factor=0.3,
+                    status_forcelist=HTTP_RETRY_STATUSES,
+                ),
+            )
+            _client.http_client.session.mount("https://", adapter)
+        return _client
+
+
+def get_worksheet() -> "gspread.Worksheet":
+    """Get the EggLog worksheet, opening it on first use."""
+    global _worksheet
+    if _worksheet is not None:
+        return _worksheet
 
-def get_worksheet() -> gspread.Worksheet:
-    """Get the EggLog worksheet."""
     client = get_client()
-    sheet_id = os.environ.get("GOOGLE_SHEETS_ID")
-    if not sheet_id:
-        raise ValueError("GOOGLE_SHEETS_ID environment variable not set")
+    with _lock:
+        if _worksheet is None:
+            sheet_id = os.environ.get("GOOGLE_SHEETS_ID")
+            if not sheet_id:
+                raise ValueError("GOOGLE_SHEETS_ID environment variable not set")
 
-    spreadsheet = client.open_by_key(sheet_id)
-    return spreadsheet.worksheet(SHEET_NAME)
+            spreadsheet = _sheets_call(client.open_by_key, sheet_id)
+            _worksheet = _sheets_call(spreadsheet.worksheet, SHEET_NAME)
+        return _worksheet
 
 
-def add_eggs(count: int) -> tuple[int, int]:
+def load_cache_ttl() -> float:
     """
-    Add eggs to today's count.
+    Get the records cache TTL in seconds from SHEETS_CACHE_TTL, once per process.
+
+    Call at startup to fail fast on a malformed value.
+    """
+    global _cache_ttl
+    if _cache_ttl is None:
+        value = os.environ.get("SHEETS_CACHE_TTL", DEFAULT_CACHE_TTL)
+        try:
+            _cache_ttl = float(value)
+        except ValueError as e:
+            raise ValueError(f"Invalid SHEETS_CACHE_TTL: {e}") from e
+    return _cache_ttl
+
+
+def _parse_count(value: str) -> int:
+    """Parse a count cell, treating blank or malformed values (e.g. "n/a") as 0."""
+    try:
+        return int(value or 0)
+    except ValueError:
+        return 0
+
+
+def _set_records(fetched_at: float, rows: dict[str, int], records: Records) -> None:
+    """Store records in the cache and index them. Caller holds _records_lock."""
+    global _records_cache, _date_index, _date_to_row
+    _records_cache = (fetched_at, records)
+    _date_to_row = dict(rows)
+    _date_index = {}
+    for i, date_str in enumerate(records[0]):
+        _date_index.setdefault(date_str, i)
+
+
+def _append_record(records: Records, date_str: str, count: int) -> None:
+    """Add a record for a date not yet in the cache. Caller holds _records_lock."""
+    dates, counts = records
+    dates.append(date_str)
+    counts.append(count)
+    _date_index[date_str] = len(dates) - 1
+
+
+def _apply_pending(records: Records) -> None:
+    """Add eggs that haven't been flushed yet onto freshly read records."""
+    for date_str, delta in _pending_deltas.items():
+        idx = _date_index.get(date_str)
+        if idx is not None:
+            records[1][idx] += delta
+        else:
+            _append_record(records, date_str, delta)
+
+
+def _range_rows(a1_range: str) -> tuple[int, int]:
+    """Get the first and last row of an A1 range such as "EggLog!A23:B24"."""
+    from gspread.utils import a1_to_rowcol
+
+    cells = a1_range.rsplit("!", 1)[-1].split(":")
+    return a1_to_rowcol(cells[0])[0], a1_to_rowcol(cells[-1])[0]
+
+
+def _is_stale(fetched_at: float) -> bool:
+    """Check whether records fetched at `fetched_at` are past the cache TTL."""
+    return not fetched_at or time.monotonic() - fetched_at >= load_cache_ttl()
+
+
+def _read_sheet() -> tuple[dict[str, int], Records]:
+    """
+    Read the last RECORD_WINDOW rows from the sheet. Caller holds _sheet_lock.
+
+    The range is open-ended, so rows appended since the last read are
+    picked up too.
 
     Returns:
-        Tuple of (today's total, weekly total)
+        Tuple of (sheet row of each date's first record, records)
     """
+    global _row_count
     worksheet = get_worksheet()
-    today = now_eastern().strftime("%Y-%m-%d")
-
-    # Get all records
-    records = worksheet.get_all_records()
-
-    # Find today's row
-    today_row = None
-    for i, record in enumerate(records):
-        if record.get("Date") == today:
-            today_row = i + 2  # +2 because of header row and 1-indexing
-            break
-
-    if today_row:
-        # Update existing row
-        current_count = int(worksheet.cell(today_row, 2).value or 0)
-        new_count = current_count + count
-        worksheet.update_cell(today_row, 2, new_count)
-    else:
-        # Add new row
-        worksheet.append_row([today, count])
-
-    # Calculate totals
-    today_total = get_today_total()
-    week_total = get_week_total()
+    if _row_count is None:
+        _row_count = len(_sheets_call(worksheet.col_values, 1))
+
+    start = max(2, _row_count - RECORD_WINDOW + 1)
+    values = _sheets_call(worksheet.get, f"A{start}:B")
+    # Short rows are a blank row or a date with an empty count cell
+    records = (
+        [row[0] if row else "" for row in values],
+        [_parse_count(row[1]) if len(row) > 1 else 0 for row in values],
+    )
+    _row_count = start + len(values) - 1
+    rows: dict[str, int] = {}
+    for i, date_str in enumerate(records[0]):
+        rows.setdefault(date_str, start + i)
+    return rows, records
+
+
+def _fetch_records() -> Records:
+    """
+    Load fresh records into the cache, from the persisted copy or the sheet.
 
-    return today_total, week_total
+    Only one load runs at a time; callers that queue up behind it reuse its
+    result instead of reading again. _records_lock is only held to swap the
+    result in, so callers that accept stale records are never blocked on I/O.
+    """
+    with _sheet_lock:
+        fetched_at, records = _records_cache
+        if records is not None and not _is_stale(fetched_at):
+            return records
+
+        persisted = _read_persisted()
+        if persisted is not None:
+            fetched_at, rows, records = persisted
+        else:
+            rows, records = _read_sheet()
+            fetched_at = time.monotonic()
+            # Persist what the sheet holds, before overlaying unflushed counts
+            _save_persisted(fetched_at, rows, records)
+
+        with _records_lock:
+            _set_records(fetched_at, rows, records)
+            _apply_pending(records)
+        return records
+
+
+def _get_redis() -> "redis.Redis | None":
+    """Return the Redis client if REDIS_URL is set, creating it on first use."""
+    global _redis
+    redis_url = os.environ.get("REDIS_URL")
+    if not redis_url:
+        return None
+    if _redis is None:
+        import redis
+
+        _redis = redis.Redis.from_url(redis_url)
+    return _redis
+
+
+def _persist_key() -> str:
+    """Get the Redis key for this spreadsheet's cached records."""
+    return f"{os.environ.get('GOOGLE_SHEETS_ID')}:records"
+
+
+def _cache_file() -> str:
+    """Get the cache file path for this spreadsheet's cached records."""
+    return os.path.join(
+        CACHE_DIR, f"eggtracker_cache_{os.environ.get('GOOGLE_SHEETS_ID')}.json"
+    )
+
+
+def _save_persisted(
+    fetched_at: float, rows: dict[str, int], records: Records
+) -> None:
+    """
+    Write records to Redis or disk. Call without holding _records_lock.
 
+    Only pass records that match the sheet, i.e. right after a read or a
+    flush, so other processes never pick up unflushed counts.
+    """
+    # Monotonic time doesn't survive a restart, so store wall-clock time
+    payload = json.dumps(
+        {
+            "fetched_at": time.time() - (time.monotonic() - fetched_at),
+            "rows": rows,
+            "row_count": _row_count,
+            "dates": records[0],
+            "counts": records[1],
+        }
+    )
+    try:
+        client = _get_redis()
+        if client is not None:
+            client.setex(_persist_key(), max(1, int(load_cache_ttl())), payload)
+        else:
+            # Write then rename so readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR)
+            try:
+                with os.fdopen(fd, "w") as f:
+                    f.write(payload)
+                os.replace(tmp_path, _cache_file())
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+    except Exception as e:
+        logger.warning(f"Error persisting records cache: {e}")
 
-def get_today_total() -> int:
-    """Get today's egg count."""
-    worksheet = get_worksheet()
-    today = now_eastern().strftime("%Y-%m-%d")
 
-    records = worksheet.get_all_records()
-    for record in records:
-        if record.get("Date") == today:
-            return int(record.get("Count", 0))
+def _read_persisted() -> tuple[float, dict[str, int], Records] | None:
+    """
+    Read still-fresh records from Redis or disk. Caller holds _sheet_lock.
+
+    Returns:
+        Tuple of (fetch time, sheet row of each date, records), or None if
+        there is nothing usable
+    """
+    global _row_count
+    try:
+        client = _get_redis()
+        if client is not None:
+            payload = client.get(_persist_key())
+        else:
+            with open(_cache_file()) as f:
+                payload = f.read()
+        if not payload:
+            return None
+        data = json.loads(payload)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Error loading persisted records cache: {e}")
+        return None
+
+    # Caches written before rows were stored can't be trusted for row numbers
+    age = time.time() - data["fetched_at"]
+    if age >= load_cache_ttl() or "rows" not in data:
+        return None
+
+    _row_count = data["row_count"]
+    records = (data["dates"], data["counts"])
+    return time.monotonic() - age, data["rows"], records
+
+
+def _cached_records(allow_stale: bool = False) -> Records:
+    """
+    Get worksheet records, re-reading the sheet at most once per TTL window.
+
+    With allow_stale, expired records are returned as-is and a load only
+    happens if nothing has been loaded yet.
+    """
+    fetched_at, records = _records_cache
+    if records is None or (not allow_stale and _is_stale(fetched_at)):
+        records = _fetch_records()
+    return records
 
-    return 0
 
+def cache_is_stale() -> bool:
+    """Check whether the cached records are due for a refresh."""
+    fetched_at, _ = _records_cache
+    return _is_stale(fetched_at)
 
-def get_week_total() -> int:
-    """Get the rolling 7-day total."""
-    worksheet = get_worksheet()
 
-    # Calculate date range (last 7 days including today)
+def refresh_records() -> None:
+    """Re-read the sheet into the cache if the cached records are stale."""
+    if cache_is_stale():
+        _fetch_records()
+
+
+def add_eggs(count: int, allow_stale: bool = False) -> tuple[int, int]:
+    """
+    Add eggs to today's count.
+
+    The eggs are added to the cached records and queued for the next
+    flush_pending() call, so this only touches the sheet on a cache miss.
+    With allow_stale, expired cached records are used instead of re-reading.
+
+    Returns:
+        Tuple of (today's total, weekly total)
+    """
     today = now_eastern().date()
-    week_ago = today - timedelta(days=6)
+    today_str = today.isoformat()
 
-    records = worksheet.get_all_records()
-    total = 0
+    _cached_records(allow_stale)
+    with _records_lock:
+        # Use the cache as of now, in case a load swapped in newer records
+        _, records = _records_cache
 
-    for record in records:
-        date_str = record.get("Date", "")
-        if date_str:
-            try:
-                record_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-                if week_ago <= record_date <= today:
-                    total += int(record.get("Count", 0))
-            except ValueError:
-                continue
+        # Find today's record
+        idx = _date_index.get(today_str)
+        if idx is not None:
+            records[1][idx] += count
+        else:
+            # Not in the sheet yet, append a row on the next flush
+            _append_record(records, today_str, count)
 
-    return total
+        _pending_deltas[today_str] = _pending_deltas.get(today_str, 0) + count
 
+        # Calculate totals against the same day the count was added to
+        today_total, week_total, _ = _compute_from_records(records, today)
 
-def get_week_breakdown() -> list[tuple[str, int]]:
+    return today_total, week_total
+
+
+def _send_writes(
+    func: Callable[..., T],
+    payload: list,
+    writes: dict[str, tuple[int, int]],
+    deltas: dict[str, int],
+) -> T:
     """
-    Get daily breakdown for the last 7 days.
+    Send one write request for `writes` (date -> (delta, count written)).
+
+    Dates whose write is done, or whose outcome is unknown, are removed from
+    `deltas`; whatever is left there on error still needs writing. Caller
+    holds _sheet_lock.
+    """
+    from gspread.exceptions import APIError
+
+    try:
+        result = _sheets_call(func, payload)
+    except APIError:
+        # The server rejected the request, so nothing was written
+        raise
+    except Exception:
+        # The request may have been applied; check the sheet before resending
+        _unconfirmed_writes.update(writes)
+        for date_str in writes:
+            del deltas[date_str]
+        raise
+    for date_str in writes:
+        del deltas[date_str]
+    return result
+
+
+def _locate_rows(
+    dates: list[str], rows: dict[str, int], current: dict[str, int]
+) -> None:
+    """
+    Look up `dates` in a fresh read of the sheet. Caller holds _sheet_lock.
+
+    `rows` and `current` are filled in with the row and count of each date
+    found; dates that aren't in the sheet are removed from both.
+    """
+    sheet_rows, (sheet_dates, counts) = _read_sheet()
+    index: dict[str, int] = {}
+    for i, date_str in enumerate(sheet_dates):
+        index.setdefault(date_str, i)
+
+    for date_str in dates:
+        if date_str in sheet_rows:
+            rows[date_str] = sheet_rows[date_str]
+            current[date_str] = counts[index[date_str]]
+        else:
+            rows.pop(date_str, None)
+            current.pop(date_str, None)
+
+
+def _write_deltas(
+    deltas: dict[str, int], rows: dict[str, int]
+) -> tuple[dict[str, int], dict[str, int]]:
+    """
+    Add `deltas` to the sheet. Caller holds _sheet_lock.
+
+    Dates in `rows` are updated in place from a fresh read of their cells;
+    the rest are appended as new rows. Rows are only trusted while column A
+    still holds their date: if rows were inserted or deleted since the cache
+    was read, or a date has no known row, the rows are looked up again first.
 
     Returns:
-        List of (date_string, count) tuples, sorted by date descending
+        Tuple of (counts written to existing rows, sheet row of each date
+        appended, as reported back by the append)
     """
     worksheet = get_worksheet()
 
+    unconfirmed = dict(_unconfirmed_writes)
+    touched = list(deltas.keys() | unconfirmed.keys())
+    current: dict[str, int] = {}
+
+    # A date without a row may have been added to the sheet since it was
+    # read (or be an unconfirmed append), so look before appending it
+    rescan = any(date_str not in rows for date_str in touched)
+    if not rescan and touched:
+        # Read the current counts of every row we're about to touch, along
+        # with their dates to check the rows haven't moved
+        cells = _sheets_call(
+            worksheet.batch_get, [f"A{rows[d]}:B{rows[d]}" for d in touched]
+        )
+        for date_str, cell in zip(touched, cells):
+            row = cell[0] if cell else []
+            if not row or row[0] != date_str:
+                rescan = True
+                break
+            current[date_str] = _parse_count(row[1]) if len(row) > 1 else 0
+    if rescan:
+        _locate_rows(touched, rows, current)
+
+    # Resend unconfirmed writes that didn't land
+    for date_str, (delta, written) in unconfirmed.items():
+        if current.get(date_str) != written:
+            deltas[date_str] = deltas.get(date_str, 0) + delta
+    _unconfirmed_writes.clear()
+
+    updates = {d: current[d] + delta for d, delta in deltas.items() if d in rows}
+    new_rows = [[d, delta] for d, delta in deltas.items() if d not in rows]
+
+    if updates:
+        _send_writes(
+            worksheet.batch_update,
+            [{"range": f"B{rows[d]}", "values": [[v]]} for d, v in updates.items()],
+            {d: (deltas[d], v) for d, v in updates.items()},
+            deltas,
+        )
+    appended: dict[str, int] = {}
+    if new_rows:
+        result = _send_writes(
+            worksheet.append_rows,
+            new_rows,
+            {d: (delta, delta) for d, delta in new_rows},
+            deltas,
+        )
+        # The sheet decides where the rows go (e.g. after rows added by hand),
+        # so take their position from the response
+        first_row, _ = _range_rows(result["updates"]["updatedRange"])
+        for i, (date_str, _) in enumerate(new_rows):
+            appended[date_str] = first_row + i
+    return updates, appended
+
+
+def flush_pending() -> None:
+    """
+    Add all queued eggs to the sheet.
+
+    Each date's delta is added to a fresh read of its row, so changes made
+    to the sheet since the cache was loaded are kept. The sheet is written
+    under _sheet_lock only, so handlers using the cache aren't blocked.
+    """
+    global _row_count
+    with _sheet_lock:
+        with _records_lock:
+            deltas = dict(_pending_deltas)
+            _pending_deltas.clear()
+            rows = {d: _date_to_row[d] for d in deltas if d in _date_to_row}
+        if not deltas and not _unconfirmed_writes:
+            return
+
+        try:
+            updates, appended = _write_deltas(deltas, rows)
+        finally:
+            # Queue whatever wasn't written again
+            with _records_lock:
+                for date_str, delta in deltas.items():
+                    _pending_deltas[date_str] = (
+                        _pending_deltas.get(date_str, 0) + delta
+                    )
+        if appended:
+            _row_count = max(_row_count or 0, *appended.values())
+
+        with _records_lock:
+            fetched_at, records = _records_cache
+            dates, counts = records
+            # Every date written or found now has a known row
+            _date_to_row.update(rows)
+            _date_to_row.update(appended)
+            # The sheet's counts plus anything added since the flush began
+            for date_str, written in updates.items():
+                idx = _date_index.get(date_str)
+                if idx is not None:
+                    counts[idx] = written + _pending_deltas.get(date_str, 0)
+
+            # Persist only what the sheet holds
+            sheet_counts = list(counts)
+            for date_str, delta in _pending_deltas.items():
+                idx = _date_index.get(date_str)
+                if idx is not None:
+                    sheet_counts[idx] -= delta
+            keep = [i for i, d in enumerate(dates) if d in _date_to_row]
+            sheet_records = (
+                [dates[i] for i in keep],
+                [sheet_counts[i] for i in keep],
+            )
+            sheet_rows = dict(_date_to_row)
+        _save_persisted(fetched_at, sheet_rows, sheet_records)
+
+
+atexit.register(flush_pending)
+
+
+def _compute_from_records(
+    records: Records,
+    today: date,
+) -> tuple[int, int, list[tuple[str, int]]]:
+    """
+    Compute today's total, weekly total and daily breakdown from sheet records.
+
+    Args:
+        records: Parallel lists of dates and counts
+        today: The day to treat as today, computed once per request
+
+    Returns:
+        Tuple of (today's total, weekly total, daily breakdown)
+    """
+    # The last 7 days, most recent first, mapped by ISO date to their index
+    days = [today - timedelta(days=i) for i in _DAY_OFFSETS]
+    valid_dates = {day.isoformat(): i for i, day in enumerate(days)}
+
+    # Sum counts per day within the last 7 days
+    day_counts = [0] * len(days)
+    for date_str, count in zip(*records):
+        if (idx := valid_dates.get(date_str)) is not None:
+            day_counts[idx] += count
+
+    today_total = day_counts[0]
+    week_total = sum(day_counts)
+
+    # Fill in all 7 days (including days with 0 eggs), formatted as shorter
+    # dates for display
+    breakdown = [
+        (day.strftime("%a %m/%d"), count) for day, count in zip(days, day_counts)
+    ]
+
+    return today_total, week_total, breakdown
+
+
+def get_stats_bundle(
+    allow_stale: bool = False,
+) -> tuple[int, int, list[tuple[str, int]]]:
+    """
+    Get all weekly statistics from a single sheet read.
+
+    With allow_stale, expired cached records are used instead of re-reading.
+
+    Returns:
+        Tuple of (today's total, weekly total, daily breakdown)
+    """
     today = now_eastern().date()
-    week_ago = today - timedelta(days=6)
+    _cached_records(allow_stale)
+    with _records_lock:
+        _, records = _records_cache
+        return _compute_from_records(records, today)
 
-    records = worksheet.get_all_records()
-    breakdown = []
 
-    # Create a dict for quick lookup
-    date_counts = {}
-    for record in records:
-        date_str = record.get("Date", "")
-        if date_str:
-            try:
-                record_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-                if week_ago <= record_date <= today:
-                    date_counts[date_str] = int(record.get("Count", 0))
-            except ValueError:
-                continue
-
-    # Fill in all 7 days (including days with 0 eggs)
-    for i in range(7):
-        day = today - timedelta(days=i)
-        date_str = day.strftime("%Y-%m-%d")
-        count = date_counts.get(date_str, 0)
-        # Format as shorter date for display
-        display_date = day.strftime("%a %m/%d")
-        breakdown.append((display_date, count))
+def get_today_total() -> int:
+    """Get today's egg count."""
+    today_total, _, _ = get_stats_bundle()
+    return today_total
 
+
+def get_week_total() -> int:
+    """Get the rolling 7-day total."""
+    _, week_total, _ = get_stats_bundle()
+    return week_total
+
+
+def get_week_breakdown() -> list[tuple[str, int]]:
+    """
+    Get daily breakdown for the last 7 days.
+
+    Returns:
+        List of (date_string, count) tuples, sorted by date descending
+    """
+    _, _, breakdown = get_stats_bundle()
     return breakdown